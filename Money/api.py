@@ -0,0 +1,276 @@
+"""
+Local HTTP API serving the ExpenseTracker numbers as JSON.
+
+Run with:
+    python api.py --port 8000
+
+Endpoints (all accept ?accounts=EUR,USD,PEN):
+    GET  /api/summary
+    GET  /api/categories
+    GET  /api/monthly
+    GET  /api/transactions?category=&currency=&q=&sort=date&page=1&page_size=50
+    POST /api/reload
+"""
+import argparse
+import asyncio
+
+import pandas as pd
+from aiohttp import web
+
+from expense_tracker import ExpenseTracker
+
+ACCOUNTS = ['EUR', 'USD', 'PEN']
+
+TRANSACTION_COLUMNS = ['date', 'vendor', 'description', 'amount', 'currency',
+                       'amount_usd', 'category', 'possible_duplicate']
+
+MAX_PAGE_SIZE = 500
+
+
+class LedgerCache:
+    """
+    Warm in-process cache of the ledger per account selection, together
+    with its summary, category and monthly aggregates and its search index.
+    All tracker work (loading, combining, indexing, reloading) runs under
+    one lock, so concurrent requests share a single computation and a
+    ledger and its search index always come from the same load.
+    Cache hits do not take the lock.
+    """
+
+    def __init__(self, tracker=None):
+        self.tracker = tracker
+        self.views = {}
+        self.lock = asyncio.Lock()
+
+    async def _run(self, func, *args):
+        """Run blocking pandas work off the event loop"""
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def _get_tracker(self):
+        # Callers hold self.lock
+        if self.tracker is None:
+            self.tracker = await self._run(ExpenseTracker)
+        return self.tracker
+
+    async def get(self, accounts, search=False):
+        """
+        Cached view of the selected accounts: a dict with the 'ledger', its
+        'summary', 'categories' and 'months', plus its 'search_index' if search
+        """
+        key = tuple(sorted(accounts))
+        view = self.views.get(key)
+        if view is not None and (not search or 'search_index' in view):
+            return view
+
+        async with self.lock:
+            # Read again under the lock: a reload may have replaced the view
+            view = self.views.get(key)
+            tracker = await self._get_tracker()
+            if view is None:
+                view = await self._run(_build_view, tracker, list(key))
+                self.views[key] = view
+            if search and 'search_index' not in view:
+                view['search_index'] = await self._run(tracker.get_search_index, list(key))
+        return view
+
+    async def transactions(self, accounts, query=None, categories=None, currencies=None,
+                           sort_by='date', start=0, stop=None):
+        """Filter, sort and page the ledger off the event loop. Returns (total, records)"""
+        view = await self.get(accounts, search=bool(query))
+        return await self._run(_select_transactions, view, query, categories, currencies,
+                               sort_by, start, stop)
+
+    async def reload(self):
+        """Re-read the CSV files and drop every cached view"""
+        async with self.lock:
+            if self.tracker is None:
+                self.tracker = await self._run(ExpenseTracker)
+            else:
+                await self._run(self.tracker.load_data)
+            self.views = {}
+
+
+def _summary(df):
+    if df.empty:
+        return {'transactions': 0}
+
+    by_currency = df.groupby('currency')['amount'].agg(['sum', 'count'])
+    return {
+        'transactions': len(df),
+        'total_usd': round(float(df['amount_usd'].sum()), 2),
+        'avg_usd': round(float(df['amount_usd'].mean()), 2),
+        'date_from': df['date'].min().strftime('%Y-%m-%d'),
+        'date_to': df['date'].max().strftime('%Y-%m-%d'),
+        'by_currency': {
+            currency: {'total': round(float(row['sum']), 2), 'transactions': int(row['count'])}
+            for currency, row in by_currency.iterrows()
+        },
+    }
+
+
+def _categories(df):
+    if df.empty:
+        return []
+
+    stats = df.groupby(df['category'].fillna('Other'))['amount_usd'].agg(['sum', 'count', 'mean'])
+    stats = stats.sort_values('sum')
+    return [
+        {
+            'category': category,
+            'total_usd': round(float(row['sum']), 2),
+            'transactions': int(row['count']),
+            'avg_usd': round(float(row['mean']), 2),
+        }
+        for category, row in stats.iterrows()
+    ]
+
+
+def _monthly(df):
+    if df.empty:
+        return []
+
+    totals = df.groupby(df['date'].dt.to_period('M').astype(str))['amount_usd'].sum()
+    return [
+        {'month': month, 'total_usd': round(float(total), 2)}
+        for month, total in totals.items()
+    ]
+
+
+def _build_view(tracker, accounts):
+    """Ledger of the selected accounts with the aggregates every request needs"""
+    ledger = tracker.get_ledger(accounts)
+    return {
+        'ledger': ledger,
+        'summary': _summary(ledger),
+        'categories': _categories(ledger),
+        'months': _monthly(ledger),
+    }
+
+
+def _select_transactions(view, query, categories, currencies, sort_by, start, stop):
+    df = view['ledger']
+    if not df.empty:
+        if query:
+            df = view['search_index'].filter(df, query)
+        if categories:
+            df = df[df['category'].isin(categories)]
+        if currencies:
+            df = df[df['currency'].isin(currencies)]
+        df = df.sort_values(sort_by, ascending=False)
+
+    page_df = df.iloc[start:stop]
+    columns = [column for column in TRANSACTION_COLUMNS if column in page_df.columns]
+    page_df = page_df[columns].round({'amount': 2, 'amount_usd': 2})
+    return len(df), _records(page_df)
+
+
+LEDGER = web.AppKey('ledger', LedgerCache)
+
+
+def _parse_accounts(request):
+    value = request.query.get('accounts')
+    if not value:
+        return ACCOUNTS
+    accounts = [account.strip().upper() for account in value.split(',') if account.strip()]
+    unknown = [account for account in accounts if account not in ACCOUNTS]
+    if unknown:
+        raise web.HTTPBadRequest(text=f"Unknown accounts: {', '.join(unknown)}")
+    return accounts
+
+
+def _parse_int(request, name, default, minimum=1, maximum=None):
+    try:
+        value = int(request.query.get(name, default))
+    except ValueError:
+        raise web.HTTPBadRequest(text=f"'{name}' must be an integer")
+    if value < minimum:
+        raise web.HTTPBadRequest(text=f"'{name}' must be at least {minimum}")
+    return min(value, maximum) if maximum else value
+
+
+def _records(df):
+    """Convert a DataFrame to JSON-safe records (ISO dates, NaN as null)"""
+    df = df.copy()
+    for column in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = df[column].dt.strftime('%Y-%m-%d')
+    df = df.astype(object).where(df.notna(), None)
+    return df.to_dict('records')
+
+
+async def summary(request):
+    accounts = _parse_accounts(request)
+    view = await request.app[LEDGER].get(accounts)
+    return web.json_response({'accounts': accounts, **view['summary']})
+
+
+async def categories(request):
+    accounts = _parse_accounts(request)
+    view = await request.app[LEDGER].get(accounts)
+    return web.json_response({'accounts': accounts, 'categories': view['categories']})
+
+
+async def monthly(request):
+    accounts = _parse_accounts(request)
+    view = await request.app[LEDGER].get(accounts)
+    return web.json_response({'accounts': accounts, 'months': view['months']})
+
+
+async def transactions(request):
+    accounts = _parse_accounts(request)
+
+    page = _parse_int(request, 'page', 1)
+    page_size = _parse_int(request, 'page_size', 50, maximum=MAX_PAGE_SIZE)
+    sort_by = request.query.get('sort', 'date')
+    if sort_by not in ('date', 'amount_usd', 'vendor', 'category'):
+        raise web.HTTPBadRequest(text="'sort' must be one of date, amount_usd, vendor, category")
+
+    start = (page - 1) * page_size
+    total, records = await request.app[LEDGER].transactions(
+        accounts,
+        query=request.query.get('q'),
+        categories=request.query.getall('category', None),
+        currencies=[c.upper() for c in request.query.getall('currency', [])],
+        sort_by=sort_by,
+        start=start,
+        stop=start + page_size,
+    )
+    return web.json_response({
+        'accounts': accounts,
+        'page': page,
+        'page_size': page_size,
+        'total': total,
+        'transactions': records,
+    })
+
+
+async def warm_cache(app):
+    """Load the data and combine all accounts before the first request"""
+    await app[LEDGER].get(ACCOUNTS)
+
+
+async def reload(request):
+    await request.app[LEDGER].reload()
+    return web.json_response({'status': 'reloaded'})
+
+
+def create_app(tracker=None):
+    """Build the aiohttp application (pass a tracker to serve existing data)"""
+    app = web.Application()
+    app[LEDGER] = LedgerCache(tracker)
+    app.on_startup.append(warm_cache)
+    app.router.add_get('/api/summary', summary)
+    app.router.add_get('/api/categories', categories)
+    app.router.add_get('/api/monthly', monthly)
+    app.router.add_get('/api/transactions', transactions)
+    app.router.add_post('/api/reload', reload)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve expense tracker aggregates as JSON")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+
+    web.run_app(create_app(), host=args.host, port=args.port)
@@ -4,6 +4,13 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
 import io
+import os
+from search_index import SearchIndex
+from engines import get_engine
+from dedup import with_transaction_ids
+from expense_tracker import TRANSACTION_FILES
+from recurring import find_recurring_payments
+from budgets import BudgetMonitor, load_budgets, normalize_rules, RULE_COLUMNS
 
 # Page configuration
 st.set_page_config(
@@ -69,55 +76,104 @@ if 'vendor_categories' not in st.session_state:
     except:
         st.session_state.vendor_categories = pd.DataFrame(columns=['vendor', 'category'])
 
+# Execution engine for combining accounts (set EXPENSE_TRACKER_ENGINE=polars to switch)
+if 'engine' not in st.session_state:
+    st.session_state.engine = get_engine()
+
+if 'budgets' not in st.session_state:
+    try:
+        st.session_state.budgets = load_budgets('budgets.csv')
+    except:
+        st.session_state.budgets = pd.DataFrame(columns=RULE_COLUMNS)
+
+# Data versions: caches below are rebuilt only when the version they were built for changes
+if 'data_version' not in st.session_state:
+    st.session_state.data_version = 0  # bumped when exchange rates or categories change
+    st.session_state.account_versions = {'EUR': 0, 'USD': 0, 'PEN': 0}  # bumped when an account is uploaded
+    st.session_state.uploads = {}
+    st.session_state.account_ledgers = {}
+    st.session_state.budget_monitors = {}
+
+ACCOUNT_FRAMES = {
+    'EUR': 'df_eur',
+    'USD': 'df_usd',
+    'PEN': 'df_pen'
+}
+
 # Functions
-def categorize_transactions(df, vendor_categories):
-    """Add category column based on vendor"""
-    df = df.copy()
-    df['category'] = df['vendor'].map(
-        vendor_categories.set_index('vendor')['category']
-    )
-    df['category'].fillna('Other', inplace=True)
-    return df
-
-def convert_to_usd(df, currency, exchange_rates):
-    """Convert amounts to USD"""
-    df = df.copy()
-    df['amount_usd'] = df['amount'] * exchange_rates[currency]
-    return df
-
-def get_combined_data(accounts, exchange_rates):
+def is_new_upload(uploaded, key):
+    """True only on the first rerun after a file is uploaded"""
+    upload_id = (uploaded.name, uploaded.size, getattr(uploaded, 'file_id', None))
+    if st.session_state.uploads.get(key) == upload_id:
+        return False
+    st.session_state.uploads[key] = upload_id
+    return True
+
+def account_version(currency):
+    return (st.session_state.data_version, st.session_state.account_versions[currency])
+
+def get_account_ledger(currency):
+    """Combined data for one account indexed by transaction id, rebuilt only when its version changes"""
+    version, ledger = st.session_state.account_ledgers.get(currency, (None, None))
+    if version != account_version(currency):
+        engine = st.session_state.engine
+        source = st.session_state[ACCOUNT_FRAMES[currency]]
+        if (engine.reads_files and st.session_state.account_versions[currency] == 0
+                and os.path.exists(TRANSACTION_FILES[currency])):
+            # Not uploaded yet: let the engine scan the bundled CSV itself
+            source = TRANSACTION_FILES[currency]
+        ledger = with_transaction_ids(engine.combine(
+            {currency: source},
+            st.session_state.vendor_categories,
+            st.session_state.exchange_rates
+        ))
+        st.session_state.account_ledgers[currency] = (account_version(currency), ledger)
+    return ledger
+
+def get_combined_data(accounts):
     """Combine selected accounts"""
-    dfs = []
-    
-    if 'EUR' in accounts and not st.session_state.df_eur.empty:
-        df_eur = st.session_state.df_eur.copy()
-        df_eur['currency'] = 'EUR'
-        df_eur['account'] = 'EUR Account'
-        df_eur = convert_to_usd(df_eur, 'EUR', exchange_rates)
-        dfs.append(df_eur)
-    
-    if 'USD' in accounts and not st.session_state.df_usd.empty:
-        df_usd = st.session_state.df_usd.copy()
-        df_usd['currency'] = 'USD'
-        df_usd['account'] = 'USD Account'
-        df_usd = convert_to_usd(df_usd, 'USD', exchange_rates)
-        dfs.append(df_usd)
+    accounts = [currency for currency in ACCOUNT_FRAMES if currency in accounts]
+    key = (tuple(accounts), tuple(account_version(currency) for currency in accounts))
     
-    if 'PEN' in accounts and not st.session_state.df_pen.empty:
-        df_pen = st.session_state.df_pen.copy()
-        df_pen['currency'] = 'PEN'
-        df_pen['account'] = 'PEN Account'
-        df_pen = convert_to_usd(df_pen, 'PEN', exchange_rates)
-        dfs.append(df_pen)
+    if st.session_state.get('combined_key') != key:
+        ledgers = [get_account_ledger(currency) for currency in accounts]
+        ledgers = [ledger for ledger in ledgers if not ledger.empty]
+        combined = pd.concat(ledgers).sort_values('date', kind='stable') if ledgers else pd.DataFrame()
+        st.session_state.combined = combined
+        st.session_state.combined_key = key
     
-    if not dfs:
-        return pd.DataFrame()
-    
-    combined = pd.concat(dfs, ignore_index=True)
-    combined['date'] = pd.to_datetime(combined['date'])
-    combined = categorize_transactions(combined, st.session_state.vendor_categories)
+    return st.session_state.combined
+
+def get_search_index(accounts):
+    """Search index over the selected accounts, re-indexing only accounts that were uploaded again"""
+    if 'search_index' not in st.session_state:
+        st.session_state.search_index = SearchIndex(['vendor', 'description'])
+        st.session_state.search_versions = {}
     
-    return combined.sort_values('date')
+    search_index = st.session_state.search_index
+    for currency in accounts:
+        # Text does not depend on exchange rates or categories, so only uploads matter
+        version = st.session_state.account_versions[currency]
+        indexed_version, indexed_ids = st.session_state.search_versions.get(currency, (None, None))
+        if indexed_version != version:
+            if indexed_ids is not None:
+                search_index.remove(indexed_ids)
+            ledger = get_account_ledger(currency)
+            search_index.add(ledger)
+            st.session_state.search_versions[currency] = (version, ledger.index)
+    return search_index
+
+def get_budget_monitor(accounts, budgets):
+    """Budget monitor for the selected accounts, re-aggregating only accounts whose data changed"""
+    monitors = []
+    for currency in accounts:
+        version, monitor = st.session_state.budget_monitors.get(currency, (None, None))
+        if version != account_version(currency):
+            # Only this account's rows (e.g. a new upload) are aggregated again
+            monitor = BudgetMonitor().add(get_account_ledger(currency))
+            st.session_state.budget_monitors[currency] = (account_version(currency), monitor)
+        monitors.append(monitor)
+    return BudgetMonitor.combine(monitors, budgets)
 
 # Sidebar
 st.sidebar.title("⚙️ Settings")
@@ -145,6 +201,7 @@ new_pen_rate = st.sidebar.number_input(
 if st.sidebar.button("Update Exchange Rates"):
     st.session_state.exchange_rates['EUR'] = new_eur_rate
     st.session_state.exchange_rates['PEN'] = new_pen_rate
+    st.session_state.data_version += 1
     st.sidebar.success("✅ Exchange rates updated!")
 
 st.sidebar.divider()
@@ -164,24 +221,40 @@ st.sidebar.header("📁 Upload CSV Files")
 
 uploaded_eur = st.sidebar.file_uploader("EUR Transactions", type=['csv'], key='eur')
 if uploaded_eur:
-    st.session_state.df_eur = pd.read_csv(uploaded_eur)
+    if is_new_upload(uploaded_eur, 'eur'):
+        st.session_state.df_eur = pd.read_csv(uploaded_eur)
+        st.session_state.account_versions['EUR'] += 1
     st.sidebar.success("✅ EUR file uploaded!")
 
 uploaded_usd = st.sidebar.file_uploader("USD Transactions", type=['csv'], key='usd')
 if uploaded_usd:
-    st.session_state.df_usd = pd.read_csv(uploaded_usd)
+    if is_new_upload(uploaded_usd, 'usd'):
+        st.session_state.df_usd = pd.read_csv(uploaded_usd)
+        st.session_state.account_versions['USD'] += 1
     st.sidebar.success("✅ USD file uploaded!")
 
 uploaded_pen = st.sidebar.file_uploader("PEN Transactions", type=['csv'], key='pen')
 if uploaded_pen:
-    st.session_state.df_pen = pd.read_csv(uploaded_pen)
+    if is_new_upload(uploaded_pen, 'pen'):
+        st.session_state.df_pen = pd.read_csv(uploaded_pen)
+        st.session_state.account_versions['PEN'] += 1
     st.sidebar.success("✅ PEN file uploaded!")
 
 uploaded_categories = st.sidebar.file_uploader("Vendor Categories", type=['csv'], key='categories')
 if uploaded_categories:
-    st.session_state.vendor_categories = pd.read_csv(uploaded_categories)
+    if is_new_upload(uploaded_categories, 'categories'):
+        st.session_state.vendor_categories = pd.read_csv(uploaded_categories)
+        st.session_state.data_version += 1
     st.sidebar.success("✅ Categories file uploaded!")
 
+uploaded_budgets = st.sidebar.file_uploader("Budgets", type=['csv'], key='budgets_file')
+if uploaded_budgets:
+    try:
+        st.session_state.budgets = normalize_rules(pd.read_csv(uploaded_budgets))
+        st.sidebar.success("✅ Budgets file uploaded!")
+    except ValueError as e:
+        st.sidebar.error(f"❌ {e}")
+
 st.sidebar.divider()
 
 # Net Worth Section
@@ -209,7 +282,7 @@ if not selected_accounts:
     st.warning("⚠️ Please select at least one account from the sidebar to view data.")
 else:
     # Get combined data
-    df = get_combined_data(selected_accounts, st.session_state.exchange_rates)
+    df = get_combined_data(selected_accounts)
     
     if df.empty:
         st.warning("⚠️ No transaction data available for the selected accounts.")
@@ -233,15 +306,31 @@ else:
             avg_transaction = df['amount_usd'].mean()
             st.metric("Avg Transaction", f"${abs(avg_transaction):,.2f}")
         
+        # Budget alerts are checked on every load
+        budget_monitor = get_budget_monitor(selected_accounts, st.session_state.budgets)
+        budget_results = budget_monitor.evaluate()
+        budget_alerts = budget_results[budget_results['status'] != 'OK'].sort_values('used', ascending=False)
+        if not budget_alerts.empty:
+            with st.expander(f"🔔 {len(budget_alerts)} budget alerts", expanded=True):
+                for _, alert in budget_alerts.iterrows():
+                    message = (f"**{alert['category']}** ({alert['period']}): "
+                               f"${alert['spent_usd']:,.2f} of ${alert['limit_usd']:,.2f} ({alert['used']:.0%})")
+                    if alert['status'] == 'Over budget':
+                        st.error(f"🚨 {message}")
+                    else:
+                        st.warning(f"⚠️ {message}")
+        
         st.divider()
         
         # Tabs for different visualizations
-        tab1, tab2, tab3, tab4, tab5 = st.tabs([
+        tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
             "📈 By Category", 
             "📅 Over Time", 
             "🏦 By Account", 
             "💼 Net Worth",
-            "📋 Transaction Details"
+            "📋 Transaction Details",
+            "🔁 Recurring",
+            "🎯 Budgets"
         ])
         
         with tab1:
@@ -411,6 +500,11 @@ else:
         with tab5:
             st.subheader("Transaction Details")
             
+            search_query = st.text_input(
+                "🔍 Search vendor or description",
+                placeholder="e.g. netflix, supermarche, combustible"
+            )
+            
             # Filters
             col1, col2, col3 = st.columns(3)
             with col1:
@@ -435,17 +529,25 @@ else:
                 )
             
             # Apply filters
-            filtered_df = df[
-                (df['category'].isin(selected_categories)) &
-                (df['currency'].isin(selected_currencies))
+            search_df = df
+            if search_query:
+                search_df = get_search_index(selected_accounts).filter(df, search_query)
+            
+            filtered_df = search_df[
+                (search_df['category'].isin(selected_categories)) &
+                (search_df['currency'].isin(selected_currencies))
             ].sort_values(sort_by, ascending=False)
             
+            possible_duplicates = int(filtered_df['possible_duplicate'].sum())
+            if possible_duplicates:
+                st.warning(f"⚠️ {possible_duplicates} transactions look like duplicates from overlapping exports (same account, day, amount and vendor).")
+            
             # Display table
-            display_df = filtered_df[['date', 'vendor', 'description', 'amount', 'currency', 'amount_usd', 'category']].copy()
+            display_df = filtered_df[['date', 'vendor', 'description', 'amount', 'currency', 'amount_usd', 'category', 'possible_duplicate']].copy()
             display_df['date'] = display_df['date'].dt.date
             display_df['amount'] = display_df['amount'].round(2)
             display_df['amount_usd'] = display_df['amount_usd'].round(2)
-            display_df.columns = ['Date', 'Vendor', 'Description', 'Amount', 'Currency', 'Amount (USD)', 'Category']
+            display_df.columns = ['Date', 'Vendor', 'Description', 'Amount', 'Currency', 'Amount (USD)', 'Category', 'Possible Duplicate']
             
             st.dataframe(display_df, use_container_width=True, hide_index=True)
             
@@ -458,6 +560,75 @@ else:
                 mime="text/csv"
             )
 
+        with tab6:
+            st.subheader("Recurring Payments")
+            st.caption("Charges from the same vendor with a similar amount at a regular interval")
+            
+            min_occurrences = st.slider("Minimum occurrences", min_value=2, max_value=12, value=3)
+            recurring = find_recurring_payments(df, min_occurrences=min_occurrences)
+            
+            if recurring.empty:
+                st.info("No recurring payments detected for the selected accounts.")
+            else:
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.metric("Recurring Payments", len(recurring))
+                with col2:
+                    st.metric("Estimated Monthly Cost (USD)", f"${abs(recurring['monthly_cost_usd'].sum()):,.2f}")
+                
+                recurring_display = recurring[['vendor', 'category', 'frequency', 'amount', 'currency', 'monthly_cost_usd', 'occurrences', 'last_date', 'next_expected']].copy()
+                recurring_display['amount'] = recurring_display['amount'].round(2)
+                recurring_display['monthly_cost_usd'] = recurring_display['monthly_cost_usd'].abs().round(2)
+                recurring_display['last_date'] = recurring_display['last_date'].dt.date
+                recurring_display['next_expected'] = recurring_display['next_expected'].dt.date
+                recurring_display.columns = ['Vendor', 'Category', 'Frequency', 'Amount', 'Currency', 'Monthly (USD)', 'Occurrences', 'Last Charge', 'Next Expected']
+                
+                st.dataframe(recurring_display, use_container_width=True, hide_index=True)
+
+        with tab7:
+            st.subheader("Budgets")
+            
+            if budget_results.empty:
+                st.info("No budgets defined. Upload a budgets CSV (category, period, limit_usd, warn_at) in the sidebar.")
+            else:
+                as_of = budget_monitor.daily.index.max().date() if not budget_monitor.daily.empty else datetime.now().date()
+                st.caption(f"Spending as of {as_of}: month to date for monthly budgets, trailing days for 7d/30d budgets")
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Budgets", len(budget_results))
+                with col2:
+                    st.metric("Warnings", int((budget_results['status'] == 'Warning').sum()))
+                with col3:
+                    st.metric("Over Budget", int((budget_results['status'] == 'Over budget').sum()))
+                
+                budget_display = budget_results[['category', 'period', 'limit_usd', 'spent_usd', 'used', 'status']].copy()
+                budget_display['limit_usd'] = budget_display['limit_usd'].round(2)
+                budget_display['spent_usd'] = budget_display['spent_usd'].round(2)
+                budget_display['used'] = (budget_display['used'] * 100).round(1)
+                budget_display.columns = ['Category', 'Period', 'Limit (USD)', 'Spent (USD)', 'Used (%)', 'Status']
+                st.dataframe(budget_display, use_container_width=True, hide_index=True)
+            
+            # Rolling spend chart
+            window = st.radio("Rolling window", options=[7, 30], index=1, horizontal=True, format_func=lambda d: f"{d} days")
+            rolling = budget_monitor.rolling_spend(window)
+            if not rolling.empty:
+                rolling_total = rolling.sum(axis=1)
+                fig = px.line(
+                    x=rolling_total.index,
+                    y=rolling_total.values,
+                    labels={'x': 'Date', 'y': f'{window}-Day Spend (USD)'},
+                    title=f"Rolling {window}-Day Spend ({', '.join(selected_accounts)})"
+                )
+                fig.update_traces(line_color='#45B7D1', line_width=3)
+                
+                limits = budget_results[(budget_results['category'] == 'All') & (budget_results['period'] == f'{window}d')]
+                for limit in limits['limit_usd']:
+                    fig.add_hline(y=limit, line_dash='dash', line_color='#E74C3C', annotation_text=f"Budget ${limit:,.0f}")
+                
+                fig.update_layout(height=400)
+                st.plotly_chart(fig, use_container_width=True)
+
 # Footer
 st.divider()
 st.caption("💡 Tip: Upload new CSV files in the sidebar to update your data. Use the exchange rate inputs to keep conversions accurate.")
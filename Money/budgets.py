@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+
+# Budget periods: number of trailing days, or None for calendar month-to-date
+PERIODS = {
+    'monthly': None,
+    '7d': 7,
+    '30d': 30
+}
+
+# Category name for rules that apply to total spending
+ALL_CATEGORIES = 'All'
+
+DEFAULT_WARN_AT = 0.8
+
+RULE_COLUMNS = ['category', 'period', 'limit_usd', 'warn_at']
+
+
+def load_budgets(path):
+    """Load budget rules from a CSV with columns category,period,limit_usd[,warn_at]"""
+    return normalize_rules(pd.read_csv(path))
+
+
+def normalize_rules(rules):
+    """Validate budget rules and fill in optional columns"""
+    rules = pd.DataFrame(rules).copy()
+    if 'period' not in rules.columns:
+        rules['period'] = 'monthly'
+    if 'warn_at' not in rules.columns:
+        rules['warn_at'] = DEFAULT_WARN_AT
+
+    missing = {'category', 'limit_usd'} - set(rules.columns)
+    if missing:
+        raise ValueError(f"Budget rules are missing columns: {', '.join(sorted(missing))}")
+
+    rules['period'] = rules['period'].fillna('monthly').astype(str).str.strip().str.lower()
+    unknown = set(rules['period']) - set(PERIODS)
+    if unknown:
+        raise ValueError(f"Unknown budget periods: {', '.join(sorted(unknown))} "
+                         f"(use {', '.join(PERIODS)})")
+
+    rules['warn_at'] = rules['warn_at'].fillna(DEFAULT_WARN_AT).astype(float)
+    rules['limit_usd'] = rules['limit_usd'].astype(float).abs()
+    return rules[RULE_COLUMNS].reset_index(drop=True)
+
+
+class BudgetMonitor:
+    """
+    Keeps daily spend per category (in USD) and evaluates budget rules
+    against month-to-date and trailing 7/30-day windows.
+
+    Transactions are reduced to one row per day, so adding new transactions
+    only aggregates the new rows and evaluating rules never rescans the ledger.
+    """
+
+    def __init__(self, rules=None):
+        self.rules = normalize_rules(rules if rules is not None else pd.DataFrame(columns=RULE_COLUMNS))
+        self.daily = pd.DataFrame(dtype=float)
+
+    def add(self, df):
+        """Add categorized transactions with 'date', 'category' and 'amount_usd' columns"""
+        if df.empty:
+            return self
+
+        expenses = df[df['amount_usd'] < 0]
+        daily = (
+            (-expenses['amount_usd'])
+            .groupby([expenses['date'].dt.normalize(), expenses['category'].fillna('Other')])
+            .sum()
+            .unstack(fill_value=0.0)
+        )
+        daily.index.name = 'date'
+        daily.columns.name = 'category'
+
+        self.daily = self.daily.add(daily, fill_value=0.0).fillna(0.0).sort_index()
+        return self
+
+    @classmethod
+    def combine(cls, monitors, rules=None):
+        """Monitor over the spend of several monitors (e.g. one per account)"""
+        combined = cls(rules)
+        for monitor in monitors:
+            combined.daily = combined.daily.add(monitor.daily, fill_value=0.0)
+        combined.daily = combined.daily.fillna(0.0).sort_index()
+        return combined
+
+    def _as_of(self, as_of):
+        if as_of is not None:
+            return pd.Timestamp(as_of).normalize()
+        if self.daily.empty:
+            return pd.Timestamp.today().normalize()
+        return self.daily.index.max()
+
+    def window_spend(self, as_of=None):
+        """
+        Spend per category for every budget period ending at as_of
+        (defaults to the last transaction date). Includes an 'All' row.
+        """
+        as_of = self._as_of(as_of)
+        if self.daily.empty:
+            return pd.DataFrame(0.0, index=pd.Index([ALL_CATEGORIES], name='category'),
+                                columns=list(PERIODS))
+
+        spend = {}
+        for period, days in PERIODS.items():
+            if days is None:
+                start = as_of.to_period('M').start_time
+            else:
+                start = as_of - pd.Timedelta(days=days - 1)
+            spend[period] = self.daily.loc[start:as_of].sum()
+
+        spend = pd.DataFrame(spend)
+        spend.loc[ALL_CATEGORIES] = spend.sum()
+        spend.index.name = 'category'
+        return spend
+
+    def rolling_spend(self, days=30, categories=None):
+        """Daily series of trailing-window spend, for charts"""
+        if self.daily.empty:
+            return pd.DataFrame()
+
+        daily = self.daily if categories is None else self.daily.reindex(columns=categories, fill_value=0.0)
+        daily = daily.asfreq('D', fill_value=0.0)
+        return daily.rolling(days, min_periods=1).sum()
+
+    def evaluate(self, as_of=None):
+        """
+        Check every budget rule at once.
+        Returns the rules with 'spent_usd', 'used' (fraction of the limit)
+        and 'status' ('OK', 'Warning' or 'Over budget') columns.
+        """
+        rules = self.rules.copy()
+        if rules.empty:
+            return rules.assign(spent_usd=[], used=[], status=[])
+
+        spend = self.window_spend(as_of).stack()
+        spend.index.names = ['category', 'period']
+        rules = rules.merge(spend.rename('spent_usd').reset_index(),
+                            on=['category', 'period'], how='left')
+        rules['spent_usd'] = rules['spent_usd'].fillna(0.0)
+
+        # A zero limit is exceeded by any spending at all
+        rules['used'] = (rules['spent_usd'] / rules['limit_usd']).fillna(0.0)
+        rules['status'] = np.select(
+            [rules['used'] >= 1, rules['used'] >= rules['warn_at']],
+            ['Over budget', 'Warning'],
+            default='OK'
+        )
+        return rules
+
+    def alerts(self, as_of=None):
+        """Rules that are over budget or past their warning threshold"""
+        results = self.evaluate(as_of)
+        return results[results['status'] != 'OK'].sort_values('used', ascending=False)
@@ -0,0 +1,214 @@
+import os
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# Columns that identify a transaction when statement exports overlap
+KEY_COLUMNS = ['account', 'date', 'amount', 'vendor', 'description']
+
+
+def _normalized_keys(df):
+    """Normalize key columns so formatting differences do not change the hash"""
+    return pd.DataFrame({
+        'account': df['account'].astype(str),
+        'date': pd.to_datetime(df['date']).dt.normalize(),
+        'amount': (pd.to_numeric(df['amount']) * 100).round().astype('int64'),
+        'vendor': df['vendor'].fillna('').astype(str).str.strip(),
+        'description': df['description'].fillna('').astype(str).str.strip(),
+    }, index=df.index)
+
+
+def fold_vendor(text):
+    """
+    Lowercase a vendor name, strip accents and collapse whitespace for the
+    near-duplicate hash, using only steps PolarsEngine._fold can reproduce
+    """
+    decomposed = unicodedata.normalize('NFKD', str(text))
+    stripped = ''.join(c for c in decomposed if unicodedata.category(c) != 'Mn')
+    return ' '.join(stripped.lower().split())
+
+
+def _fold_column(series):
+    """Fold a vendor column, processing each distinct value once"""
+    uniques = series.unique()
+    folded = {value: fold_vendor(value) for value in uniques}
+    return series.map(folded)
+
+
+def exact_hashes(df):
+    """64-bit hash of (account, date, amount, vendor, description) per row"""
+    keys = _normalized_keys(df)
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+
+def near_hashes(df):
+    """
+    Looser 64-bit hash per row: same account, day and amount with the vendor
+    accent/case-folded and the description ignored
+    """
+    keys = _normalized_keys(df)[['account', 'date', 'amount', 'vendor']]
+    keys['vendor'] = _fold_column(keys['vendor'])
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+
+def occurrences(hashes):
+    """Number of earlier rows with the same hash, per row (0 for the first one)"""
+    return pd.Series(hashes).groupby(hashes).cumcount().to_numpy()
+
+
+def _transaction_ids(exact, occurrence):
+    return pd.util.hash_pandas_object(
+        pd.DataFrame({'exact': exact, 'occurrence': occurrence}), index=False
+    ).to_numpy()
+
+
+def with_transaction_ids(df, occurrence=None):
+    """
+    Index df by a stable transaction id that does not change when other
+    rows are added or removed: the exact hash plus the row's occurrence
+    number, so repeated identical transactions get distinct ids
+    """
+    df = df.copy()
+    if not df.empty:
+        exact = exact_hashes(df)
+        if occurrence is None:
+            occurrence = occurrences(exact)
+        df.index = pd.Index(_transaction_ids(exact, occurrence), name='transaction_id')
+    return df
+
+
+class HashIndex:
+    """Compact multiset of 64-bit row hashes kept as sorted numpy arrays of hashes and counts"""
+
+    def __init__(self, hashes=None, counts=None):
+        if hashes is None:
+            hashes = np.empty(0, dtype=np.uint64)
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if counts is None:
+            hashes, counts = np.unique(hashes, return_counts=True)
+        self.hashes = hashes
+        self.counts = np.asarray(counts, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def count(self, hashes):
+        """Vectorized count lookup, one binary search per row"""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if len(self.hashes) == 0:
+            return np.zeros(len(hashes), dtype=np.int64)
+        positions = np.searchsorted(self.hashes, hashes)
+        positions = np.minimum(positions, len(self.hashes) - 1)
+        return np.where(self.hashes[positions] == hashes, self.counts[positions], 0)
+
+    def contains(self, hashes):
+        return self.count(hashes) > 0
+
+    def add(self, hashes):
+        hashes = np.concatenate([self.hashes, np.asarray(hashes, dtype=np.uint64)])
+        weights = np.concatenate([self.counts, np.ones(len(hashes) - len(self.counts), dtype=np.int64)])
+        self.hashes, inverse = np.unique(hashes, return_inverse=True)
+        self.counts = np.bincount(inverse, weights=weights, minlength=len(self.hashes)).astype(np.int64)
+
+
+def flag_duplicates(df):
+    """
+    Flag near-duplicates in a single frame with a boolean 'possible_duplicate'
+    column. No rows are dropped: identical rows inside one file are separate
+    purchases (two coffees on the same day). Overlap between exports is
+    removed when importing, by TransactionDeduplicator.
+    """
+    df = df.copy()
+    if df.empty:
+        df['possible_duplicate'] = pd.Series(dtype=bool)
+        return df
+
+    df['possible_duplicate'] = pd.Series(near_hashes(df)).duplicated(keep=False).to_numpy()
+    return df
+
+
+def _file_stats(paths):
+    """Size and modification time of each file, a cheap fingerprint of its contents"""
+    stats = [os.stat(path) for path in paths]
+    return np.array([[stat.st_size, stat.st_mtime_ns] for stat in stats], dtype=np.int64).reshape(-1, 2)
+
+
+class TransactionDeduplicator:
+    """
+    Persistent record of every imported transaction, so re-importing an
+    overlapping statement export only costs one hash lookup per row.
+    Hashes are counted, so a transaction repeated inside one export is
+    imported as many times as it appears there.
+    """
+
+    def __init__(self, path=None, sources=()):
+        self.path = path
+        self.sources = [str(source) for source in sources]
+        self.exact = HashIndex()
+        self.near = HashIndex()
+
+    @classmethod
+    def load_or_build(cls, path, df, sources=()):
+        """
+        Load the saved index for df, rebuilding it if it is missing or stale.
+        sources: the CSV files df was read from; the saved index is reused
+        only while their sizes and modification times are unchanged, so an
+        up-to-date index is loaded without hashing the ledger
+        """
+        deduplicator = cls(path, sources)
+
+        if path and deduplicator.sources and os.path.exists(path):
+            try:
+                with np.load(path) as data:
+                    if ('stats' in data and list(data['sources']) == deduplicator.sources
+                            and np.array_equal(data['stats'], _file_stats(deduplicator.sources))):
+                        deduplicator.exact = HashIndex(data['exact'], data['exact_counts'])
+                        deduplicator.near = HashIndex(data['near'], data['near_counts'])
+                        return deduplicator
+            except Exception as e:
+                print(f"Error loading duplicate index: {e}")
+
+        if not df.empty:
+            deduplicator.exact.add(exact_hashes(df))
+            deduplicator.near.add(near_hashes(df))
+        deduplicator.save()
+        return deduplicator
+
+    def save(self):
+        """Save the index with the current fingerprint of its source files (call after writing them)"""
+        if not self.path:
+            return
+        np.savez(self.path,
+                 exact=self.exact.hashes, exact_counts=self.exact.counts,
+                 near=self.near.hashes, near_counts=self.near.counts,
+                 sources=np.array(self.sources, dtype=str), stats=_file_stats(self.sources))
+
+    def filter_new(self, df):
+        """
+        Return the rows of df not imported yet, indexed by transaction id,
+        flagging near-duplicates of already imported or sibling rows, and
+        record them in the index.
+        A row repeated n times in df is new only beyond the n-th copy already
+        imported, so overlapping exports are skipped but repeats are kept.
+        Returns (new_rows, number_of_dropped_duplicates).
+        """
+        if df.empty:
+            return flag_duplicates(df), 0
+
+        exact = exact_hashes(df)
+        near = near_hashes(df)
+        occurrence = occurrences(exact)
+        new = occurrence >= self.exact.count(exact)
+
+        new_rows = df[new].copy()
+        new_rows.index = pd.Index(_transaction_ids(exact[new], occurrence[new]), name='transaction_id')
+        new_near = near[new]
+        new_rows['possible_duplicate'] = (
+            self.near.contains(new_near) |
+            pd.Series(new_near).duplicated(keep=False).to_numpy()
+        )
+
+        self.exact.add(exact[new])
+        self.near.add(new_near)
+        return new_rows, int((~new).sum())
@@ -0,0 +1,256 @@
+"""
+Execution engines for the combine pipeline used by ExpenseTracker and app.py:
+concat accounts -> parse dates -> flag duplicates -> categorize -> convert to USD -> sort.
+
+The pandas engine runs the steps eagerly. The polars engine (optional,
+`pip install polars pyarrow`) builds the same pipeline as a single lazy
+query plan that runs multithreaded. For CSV sources only the needed
+columns are parsed (this only saves work when the files have extra
+columns) and a date range is applied while the file is read.
+
+Select the engine with ExpenseTracker(engine='polars') or the
+EXPENSE_TRACKER_ENGINE environment variable. Check that both engines give
+the same result on the bundled CSV files with:
+    python engines.py
+"""
+import os
+import time
+
+import pandas as pd
+
+from dedup import flag_duplicates
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+ENGINE_ENV_VAR = 'EXPENSE_TRACKER_ENGINE'
+
+# Columns read from every transaction source
+BASE_COLUMNS = ['amount', 'vendor', 'date', 'description']
+
+OUTPUT_COLUMNS = BASE_COLUMNS + ['currency', 'account', 'possible_duplicate', 'category', 'amount_usd']
+
+# Default pandas dtypes for text and parsed dates (they differ between pandas versions)
+STRING_DTYPE = pd.Series(['']).dtype
+DATE_DTYPE = pd.to_datetime(pd.Series(['2025-01-01'])).dtype
+
+
+def _in_range(dates, start=None, end=None):
+    """Mask of dates within the inclusive range [start, end]"""
+    mask = pd.Series(True, index=dates.index)
+    if start is not None:
+        mask &= dates >= pd.Timestamp(start)
+    if end is not None:
+        mask &= dates <= pd.Timestamp(end)
+    return mask
+
+
+def _read_source(source):
+    """A source is either a CSV path or an already loaded DataFrame"""
+    if isinstance(source, (str, os.PathLike)):
+        return pd.read_csv(source, usecols=BASE_COLUMNS)
+    return source[BASE_COLUMNS]
+
+
+class PandasEngine:
+    """Eager pandas implementation of the combine pipeline"""
+
+    name = 'pandas'
+    # Whether CSV paths are a better source than loaded DataFrames
+    reads_files = False
+
+    def combine(self, sources, vendor_categories, exchange_rates, start=None, end=None, categories=None):
+        """
+        sources: dict {currency: CSV path or DataFrame}
+        start, end: optional inclusive date range, applied to each source
+        before anything else (duplicates are flagged within the range)
+        categories: optional list of categories to keep
+        Returns the combined, categorized ledger sorted by date
+        """
+        dfs = []
+        for currency, source in sources.items():
+            df = _read_source(source).copy()
+            if start is not None or end is not None:
+                df = df[_in_range(pd.to_datetime(df['date']), start, end)]
+            if df.empty:
+                continue
+            df['currency'] = currency
+            df['account'] = f'{currency} Account'
+            dfs.append(df)
+
+        if not dfs:
+            return pd.DataFrame()
+
+        combined = pd.concat(dfs, ignore_index=True)
+        combined['date'] = pd.to_datetime(combined['date'])
+        combined = flag_duplicates(combined)
+        combined['category'] = combined['vendor'].map(
+            vendor_categories.set_index('vendor')['category']
+        ).fillna('Other')
+        combined['amount_usd'] = combined['amount'] * combined['currency'].map(exchange_rates)
+        if categories is not None:
+            combined = combined[combined['category'].isin(categories)]
+            if combined.empty:
+                return pd.DataFrame()
+
+        return combined[OUTPUT_COLUMNS].sort_values('date', kind='stable')
+
+
+class PolarsEngine:
+    """Lazy polars implementation of the combine pipeline"""
+
+    name = 'polars'
+    reads_files = True
+
+    def __init__(self):
+        if pl is None:
+            raise ImportError("The polars engine needs polars (pip install polars pyarrow)")
+
+    def _scan(self, source):
+        if isinstance(source, (str, os.PathLike)):
+            # Projection pushdown: only the base columns are parsed from the file.
+            # Dates are parsed by the reader so date filters are pushed into the scan
+            return pl.scan_csv(source, schema_overrides={
+                'amount': pl.Float64, 'vendor': pl.Utf8, 'date': pl.Datetime('us'), 'description': pl.Utf8
+            }).select(BASE_COLUMNS)
+        if source.empty:
+            return None
+        return pl.from_pandas(source[BASE_COLUMNS]).lazy()
+
+    def _fold(self, text):
+        """Native equivalent of dedup.fold_vendor"""
+        return (
+            text.str.normalize('NFKD')
+            .str.replace_all(r'\p{Mn}', '')
+            .str.to_lowercase()
+            .str.replace_all(r'\s+', ' ')
+            .str.strip_chars()
+        )
+
+    def plan(self, sources, vendor_categories, exchange_rates, start=None, end=None, categories=None):
+        """
+        Build the lazy query plan (returns None when there is no data).
+        The date range is a predicate on each scan; the category filter runs
+        after duplicates are flagged, since near-duplicates can differ in category
+        """
+        frames = []
+        for currency, source in sources.items():
+            frame = self._scan(source)
+            if frame is None:
+                continue
+            if frame.collect_schema()['date'] != pl.Datetime:
+                frame = frame.with_columns(pl.col('date').cast(pl.Utf8).str.to_datetime())
+            if start is not None:
+                frame = frame.filter(pl.col('date') >= pd.Timestamp(start).to_pydatetime())
+            if end is not None:
+                frame = frame.filter(pl.col('date') <= pd.Timestamp(end).to_pydatetime())
+            frames.append(frame.with_columns(
+                pl.col('amount').cast(pl.Float64),
+                pl.col('date').cast(pl.Datetime('us')),
+                pl.lit(currency).alias('currency'),
+                pl.lit(f'{currency} Account').alias('account'),
+            ))
+
+        if not frames:
+            return None
+
+        category_of = dict(zip(vendor_categories['vendor'], vendor_categories['category']))
+        # Same key as dedup.near_hashes
+        near_key = pl.struct(
+            pl.col('account'),
+            pl.col('date').dt.truncate('1d'),
+            (pl.col('amount') * 100).round().cast(pl.Int64),
+            self._fold(pl.col('vendor').fill_null('').str.strip_chars()),
+        )
+
+        plan = (
+            pl.concat(frames, how='vertical_relaxed')
+            .with_row_index('row')
+            .with_columns(
+                near_key.is_duplicated().alias('possible_duplicate'),
+                pl.col('vendor').replace_strict(category_of, default=None, return_dtype=pl.Utf8)
+                .fill_null('Other').alias('category'),
+                (pl.col('amount') * pl.col('currency').replace_strict(exchange_rates, return_dtype=pl.Float64))
+                .alias('amount_usd'),
+            )
+        )
+        if categories is not None:
+            plan = plan.filter(pl.col('category').is_in(list(categories)))
+        return plan.sort('date', maintain_order=True).select(['row'] + OUTPUT_COLUMNS)
+
+    def combine(self, sources, vendor_categories, exchange_rates, start=None, end=None, categories=None):
+        """Same contract as PandasEngine.combine"""
+        plan = self.plan(sources, vendor_categories, exchange_rates, start, end, categories)
+        if plan is None:
+            return pd.DataFrame()
+
+        collected = plan.collect()
+        if collected.is_empty():
+            return pd.DataFrame()
+
+        combined = collected.to_pandas().set_index('row')
+        # Keep the row labels and dtypes of the pandas engine
+        combined.index = combined.index.astype('int64')
+        combined.index.name = None
+        for column in ['vendor', 'description', 'currency', 'account', 'category']:
+            combined[column] = combined[column].astype(STRING_DTYPE)
+        combined['date'] = combined['date'].astype(DATE_DTYPE)
+        return combined
+
+
+ENGINES = {
+    'pandas': PandasEngine,
+    'polars': PolarsEngine
+}
+
+
+def get_engine(name=None):
+    """
+    Return the engine called name, or the one configured in
+    EXPENSE_TRACKER_ENGINE (default 'pandas'). Falls back to pandas
+    when polars is not installed.
+    """
+    name = (name or os.environ.get(ENGINE_ENV_VAR) or 'pandas').lower()
+    if name not in ENGINES:
+        raise ValueError(f"Unknown engine '{name}' (use {', '.join(ENGINES)})")
+
+    try:
+        return ENGINES[name]()
+    except ImportError as e:
+        print(f"{e}; using the pandas engine instead")
+        return PandasEngine()
+
+
+def compare_engines(sources, vendor_categories, exchange_rates, engine=None, **filters):
+    """
+    Run the pandas engine and another engine on the same sources (and
+    optional start/end/categories filters) and raise AssertionError if
+    their results differ
+    """
+    engine = engine or PolarsEngine()
+    expected = PandasEngine().combine(sources, vendor_categories, exchange_rates, **filters)
+    actual = engine.combine(sources, vendor_categories, exchange_rates, **filters)
+    pd.testing.assert_frame_equal(expected, actual)
+    return True
+
+
+if __name__ == "__main__":
+    from expense_tracker import EXCHANGE_RATES
+
+    sources = {
+        'EUR': 'transactions_eur.csv',
+        'USD': 'transactions_usd.csv',
+        'PEN': 'transactions_pen.csv'
+    }
+    vendor_categories = pd.read_csv('vendor_categories.csv')
+
+    for name in ENGINES:
+        engine = get_engine(name)
+        start = time.perf_counter()
+        result = engine.combine(sources, vendor_categories, EXCHANGE_RATES)
+        print(f"{engine.name:8s}: {len(result)} rows in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    compare_engines(sources, vendor_categories, EXCHANGE_RATES, get_engine('polars'))
+    print("✓ Engines produce the same result")
@@ -1,7 +1,13 @@
+import os
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
+from search_index import SearchIndex
+from dedup import TransactionDeduplicator, with_transaction_ids
+from recurring import find_recurring_payments
+from budgets import BudgetMonitor, load_budgets
+from engines import get_engine, OUTPUT_COLUMNS
 
 # Exchange rates (you can update these manually)
 EXCHANGE_RATES = {
@@ -10,12 +16,35 @@ EXCHANGE_RATES = {
     'PEN': 0.27   # PEN to USD
 }
 
+# Transaction files per account
+TRANSACTION_FILES = {
+    'EUR': 'transactions_eur.csv',
+    'USD': 'transactions_usd.csv',
+    'PEN': 'transactions_pen.csv'
+}
+
+# Hashes of every imported transaction, used to skip overlapping exports
+DEDUP_INDEX_FILE = 'dedup_index.npz'
+
+# Budget rules: category,period,limit_usd,warn_at
+BUDGETS_FILE = 'budgets.csv'
+
 class ExpenseTracker:
-    def __init__(self):
+    def __init__(self, engine=None):
+        """
+        engine: 'pandas' or 'polars' (defaults to the EXPENSE_TRACKER_ENGINE
+        environment variable, then pandas)
+        """
+        self.engine = get_engine(engine)
         self.transactions_eur = None
         self.transactions_usd = None
         self.transactions_pen = None
         self.vendor_categories = None
+        self.ledgers = {}
+        self.search_indexes = {}
+        self.deduplicator = None
+        self.budgets = None
+        self.budget_monitors = {}
         self.load_data()
     
     def load_data(self):
@@ -34,10 +63,25 @@ class ExpenseTracker:
             self.transactions_pen['account'] = 'PEN Account'
             
             self.vendor_categories = pd.read_csv('vendor_categories.csv')
+            self.ledgers = {}
+            self.search_indexes = {}
+            
+            self.deduplicator = TransactionDeduplicator.load_or_build(
+                DEDUP_INDEX_FILE,
+                pd.concat([self.transactions_eur, self.transactions_usd, self.transactions_pen],
+                          ignore_index=True),
+                sources=list(TRANSACTION_FILES.values())
+            )
             
             print("✓ Data loaded successfully!")
         except Exception as e:
             print(f"Error loading data: {e}")
+        
+        self.budget_monitors = {}
+        try:
+            self.budgets = load_budgets(BUDGETS_FILE) if os.path.exists(BUDGETS_FILE) else None
+        except Exception as e:
+            print(f"Error loading budgets: {e}")
     
     def categorize_transactions(self, df):
         """Add category column based on vendor"""
@@ -57,29 +101,149 @@ class ExpenseTracker:
         )
         return df
     
-    def get_combined_data(self, accounts=['EUR', 'USD', 'PEN']):
+    def get_combined_data(self, accounts=['EUR', 'USD', 'PEN'], start=None, end=None, categories=None):
         """
         Combine selected accounts
         accounts: list of account currencies to include
+        start, end: optional inclusive date range
+        categories: optional list of categories to include
         """
-        dfs = []
+        sources = {}
         
         if 'EUR' in accounts:
-            dfs.append(self.transactions_eur)
+            sources['EUR'] = self.transactions_eur
         if 'USD' in accounts:
-            dfs.append(self.transactions_usd)
+            sources['USD'] = self.transactions_usd
         if 'PEN' in accounts:
-            dfs.append(self.transactions_pen)
+            sources['PEN'] = self.transactions_pen
+        
+        # Imports are appended to the CSV files right away, so the files
+        # match the loaded data and lazy engines can scan them directly
+        if self.engine.reads_files:
+            sources = {currency: TRANSACTION_FILES[currency] for currency in sources}
+        
+        return self.engine.combine(sources, self.vendor_categories, EXCHANGE_RATES,
+                                   start=start, end=end, categories=categories)
+    
+    def import_transactions(self, path, currency):
+        """
+        Append a statement export to an account, skipping rows already imported
+        Returns the number of new transactions
+        """
+        new = pd.read_csv(path)
+        new['currency'] = currency
+        new['account'] = f'{currency} Account'
+        
+        new_rows, dropped = self.deduplicator.filter_new(new)
+        possible_duplicates = new_rows.pop('possible_duplicate')
+        flagged = int(possible_duplicates.sum())
+        
+        if new_rows.empty:
+            print(f"✓ Nothing new to import into {currency} Account ({dropped} duplicates skipped)")
+            return 0
+        
+        attribute = f'transactions_{currency.lower()}'
+        setattr(self, attribute, pd.concat([getattr(self, attribute), new_rows], ignore_index=True))
+        new_rows[['amount', 'vendor', 'date', 'description']].to_csv(
+            f'{attribute}.csv', mode='a', header=False, index=False
+        )
+        self.deduplicator.save()
+        
+        # Cached ledgers, search indexes and budget monitors only need the new rows
+        new_rows['date'] = pd.to_datetime(new_rows['date'])
+        new_rows['possible_duplicate'] = possible_duplicates
+        new_rows['category'] = new_rows['vendor'].map(
+            self.vendor_categories.set_index('vendor')['category']
+        ).fillna('Other')
+        new_rows['amount_usd'] = new_rows['amount'] * new_rows['currency'].map(EXCHANGE_RATES)
+        new_rows = new_rows[OUTPUT_COLUMNS]
+        
+        for key in list(self.ledgers):
+            if currency in key:
+                self.ledgers[key] = pd.concat([self.ledgers[key], new_rows]).sort_values('date', kind='stable')
+        for key, search_index in self.search_indexes.items():
+            if currency in key:
+                search_index.add(new_rows)
+        for key, monitor in self.budget_monitors.items():
+            if currency in key:
+                monitor.add(new_rows)
+        
+        print(f"✓ Imported {len(new_rows)} transactions into {currency} Account "
+              f"({dropped} duplicates skipped, {flagged} possible duplicates)")
+        return len(new_rows)
+    
+    def get_ledger(self, accounts=['EUR', 'USD', 'PEN']):
+        """
+        Cached combined data indexed by transaction id
+        Imports append to it instead of rebuilding it
+        """
+        key = tuple(sorted(accounts))
+        if key not in self.ledgers:
+            self.ledgers[key] = with_transaction_ids(self.get_combined_data(accounts))
+        return self.ledgers[key]
+    
+    def get_search_index(self, accounts=['EUR', 'USD', 'PEN']):
+        """
+        Search index over get_ledger(accounts), keyed by transaction id
+        The index is built on first use and only new rows are indexed afterwards
+        """
+        key = tuple(sorted(accounts))
+        if key not in self.search_indexes:
+            self.search_indexes[key] = SearchIndex(['vendor', 'description'])
+            self.search_indexes[key].add(self.get_ledger(accounts))
+        return self.search_indexes[key]
+    
+    def search(self, query, accounts=['EUR', 'USD', 'PEN']):
+        """Full-text search over vendor and description"""
+        df = self.get_ledger(accounts)
+        
+        if df.empty:
+            return df
+        
+        return self.get_search_index(accounts).filter(df, query)
+    
+    def recurring_payments(self, accounts=['EUR', 'USD', 'PEN'], min_occurrences=3):
+        """Detect and print recurring payments (subscriptions, bills) for selected accounts"""
+        df = self.get_combined_data(accounts)
+        recurring = find_recurring_payments(df, min_occurrences=min_occurrences)
+        
+        if recurring.empty:
+            print("No recurring payments found")
+            return recurring
+        
+        print(f"\n--- Recurring Payments ({', '.join(accounts)} accounts) ---")
+        for _, row in recurring.iterrows():
+            print(f"{row['vendor']:20s}: {row['amount']:10,.2f} {row['currency']} "
+                  f"{row['frequency'].lower():9s} (~${abs(row['monthly_cost_usd']):,.2f}/month, "
+                  f"next {row['next_expected'].date()})")
+        print(f"\nEstimated monthly total: ${abs(recurring['monthly_cost_usd'].sum()):,.2f}\n")
+        
+        return recurring
+    
+    def check_budgets(self, accounts=['EUR', 'USD', 'PEN'], as_of=None):
+        """
+        Evaluate budget rules for selected accounts and print alerts
+        as_of: date to evaluate at (defaults to the last transaction date)
+        """
+        if self.budgets is None or self.budgets.empty:
+            print(f"No budgets defined (add rules to {BUDGETS_FILE})")
+            return None
         
-        if not dfs:
-            return pd.DataFrame()
+        key = tuple(sorted(accounts))
+        if key not in self.budget_monitors:
+            self.budget_monitors[key] = BudgetMonitor(self.budgets).add(self.get_ledger(accounts))
+        results = self.budget_monitors[key].evaluate(as_of)
         
-        combined = pd.concat(dfs, ignore_index=True)
-        combined['date'] = pd.to_datetime(combined['date'])
-        combined = self.categorize_transactions(combined)
-        combined = self.convert_to_usd(combined)
+        alerts = results[results['status'] != 'OK'].sort_values('used', ascending=False)
+        print(f"\n--- Budget Alerts ({', '.join(accounts)} accounts) ---")
+        if alerts.empty:
+            print("All budgets on track")
+        for _, row in alerts.iterrows():
+            print(f"{row['status']:12s} {row['category']:20s} {row['period']:8s}: "
+                  f"${row['spent_usd']:,.2f} of ${row['limit_usd']:,.2f} ({row['used']:.0%})")
+        print()
         
-        return combined.sort_values('date')
+        return results
     
     def plot_expenses_by_category(self, accounts=['EUR', 'USD', 'PEN']):
         """Plot expenses by category for selected accounts"""
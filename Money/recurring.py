@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+# Typical billing periods in days, used to label detected payments
+FREQUENCIES = {
+    'Weekly': 7,
+    'Biweekly': 14,
+    'Monthly': 30.44,
+    'Quarterly': 91.31,
+    'Yearly': 365.25
+}
+
+RESULT_COLUMNS = [
+    'vendor', 'currency', 'category', 'frequency', 'occurrences',
+    'interval_days', 'amount', 'amount_usd', 'monthly_cost_usd',
+    'first_date', 'last_date', 'next_expected'
+]
+
+
+def _label_frequency(interval_days):
+    """Map median intervals to the closest billing period name"""
+    names = np.array(list(FREQUENCIES))
+    periods = np.array(list(FREQUENCIES.values()))
+    closest = np.abs(np.log(interval_days.to_numpy()[:, None] / periods)).argmin(axis=1)
+    return names[closest]
+
+
+def find_recurring_payments(df, min_occurrences=3, amount_tolerance=0.15,
+                            interval_tolerance=0.25, min_interval_days=5):
+    """
+    Detect recurring payments: same vendor and currency, similar amount,
+    regular interval between charges. A vendor with several subscriptions
+    at different prices gives one result per subscription.
+
+    All statistics are computed with grouped, vectorized operations over the
+    whole ledger, so there is no Python loop per vendor.
+    amount_tolerance: max relative spread (std / |mean|) of the amounts
+    interval_tolerance: max relative spread of the days between charges
+    """
+    # Refunds and other credits are not part of a billing series
+    charges = df[df['amount'] < 0] if not df.empty else df
+    if charges.empty:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+
+    # One vendor can bill several subscriptions (e.g. Apple at 0.99 and 9.99):
+    # split its charges into amount clusters wherever consecutive amounts
+    # differ by more than amount_tolerance
+    ledger = charges[['vendor', 'currency', 'date', 'amount', 'amount_usd', 'category']]
+    ledger = ledger.sort_values(['vendor', 'currency', 'amount'])
+    log_amount = np.log(ledger['amount'].abs())
+    gaps = log_amount.groupby([ledger['vendor'], ledger['currency']], sort=False).diff()
+    ledger = ledger.assign(series=(gaps.isna() | (gaps.abs() > np.log1p(amount_tolerance))).cumsum())
+
+    keys = ['vendor', 'currency', 'series']
+    ledger = ledger.sort_values(keys + ['date'])
+    intervals = ledger.groupby(keys, sort=False)['date'].diff().dt.days
+    # Same-day repeats (split payments, overlapping exports) say nothing about the period
+    ledger['interval_days'] = intervals.where(intervals > 0)
+
+    grouped = ledger.groupby(keys, sort=False)
+    stats = grouped.agg(
+        category=('category', 'first'),
+        occurrences=('date', 'nunique'),
+        first_date=('date', 'min'),
+        last_date=('date', 'max'),
+        amount=('amount', 'median'),
+        amount_usd=('amount_usd', 'median'),
+        amount_mean=('amount', 'mean'),
+        amount_std=('amount', 'std'),
+        interval_days=('interval_days', 'median'),
+        interval_mean=('interval_days', 'mean'),
+        interval_std=('interval_days', 'std'),
+    )
+
+    amount_spread = (stats['amount_std'].fillna(0) / stats['amount_mean'].abs()).fillna(0)
+    interval_spread = (stats['interval_std'].fillna(0) / stats['interval_mean']).fillna(np.inf)
+
+    recurring = stats[
+        (stats['occurrences'] >= min_occurrences) &
+        (stats['interval_days'] >= min_interval_days) &
+        (amount_spread <= amount_tolerance) &
+        (interval_spread <= interval_tolerance)
+    ].copy()
+
+    if recurring.empty:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+
+    recurring['frequency'] = _label_frequency(recurring['interval_days'])
+    recurring['monthly_cost_usd'] = recurring['amount_usd'] * FREQUENCIES['Monthly'] / recurring['interval_days']
+    recurring['next_expected'] = recurring['last_date'] + pd.to_timedelta(recurring['interval_days'], unit='D')
+
+    recurring = recurring.reset_index()[RESULT_COLUMNS]
+    return recurring.sort_values('monthly_cost_usd').reset_index(drop=True)
@@ -0,0 +1,142 @@
+import re
+import unicodedata
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+
+# Runs of letters and digits in any script (\w without the underscore)
+TOKEN_PATTERN = re.compile(r'[^\W_]+')
+
+
+def fold_text(text):
+    """Lowercase text and strip accents (e.g. 'Supermarché' -> 'supermarche')"""
+    decomposed = unicodedata.normalize('NFKD', str(text))
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return stripped.casefold()
+
+
+def tokenize(text):
+    """Split text into accent-folded, lowercase alphanumeric tokens in any script"""
+    if text is None or (isinstance(text, float) and pd.isna(text)):
+        return []
+    return TOKEN_PATTERN.findall(fold_text(text))
+
+
+class SearchIndex:
+    """
+    Inverted index over the text columns of a transactions DataFrame.
+    Maps every token to the set of row labels containing it, so a query
+    only touches the postings of its own tokens instead of scanning rows.
+    Labels should be stable transaction ids (see dedup.with_transaction_ids)
+    so rows can be added and removed without rebuilding the index.
+    """
+
+    def __init__(self, columns=('vendor', 'description')):
+        self.columns = list(columns)
+        self.postings = {}
+        self.indexed_labels = set()
+        self._vocabulary = []
+        self._vocabulary_dirty = False
+
+    def __len__(self):
+        return len(self.indexed_labels)
+
+    def add(self, df):
+        """
+        Index the rows of df whose labels are not indexed yet.
+        Calling this again with a grown DataFrame only processes the new rows.
+        """
+        if df.empty:
+            return 0
+
+        new_rows = df[~df.index.isin(self.indexed_labels)]
+        if new_rows.empty:
+            return 0
+
+        labels = new_rows.index.to_numpy()
+        for column in self.columns:
+            if column not in new_rows.columns:
+                continue
+            # Vendors and descriptions repeat a lot, so tokenize each
+            # distinct string once and fan its tokens out to all its rows
+            codes, uniques = pd.factorize(new_rows[column])
+            rows_by_code = pd.Series(labels).groupby(codes).apply(set)
+            for code, rows in rows_by_code.items():
+                if code < 0:
+                    continue
+                for token in set(tokenize(uniques[code])):
+                    bucket = self.postings.get(token)
+                    if bucket is None:
+                        self.postings[token] = set(rows)
+                        self._vocabulary_dirty = True
+                    else:
+                        bucket.update(rows)
+
+        self.indexed_labels.update(labels.tolist())
+        return len(labels)
+
+    def remove(self, labels):
+        """Drop rows from the index (e.g. when transactions are deleted)"""
+        labels = set(labels) & self.indexed_labels
+        if not labels:
+            return 0
+
+        for token in list(self.postings):
+            bucket = self.postings[token]
+            bucket.difference_update(labels)
+            if not bucket:
+                del self.postings[token]
+                self._vocabulary_dirty = True
+
+        self.indexed_labels.difference_update(labels)
+        return len(labels)
+
+    def _prefix_matches(self, prefix):
+        """Union of postings for every token starting with prefix"""
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self.postings)
+            self._vocabulary_dirty = False
+
+        matches = set()
+        position = bisect_left(self._vocabulary, prefix)
+        while position < len(self._vocabulary):
+            token = self._vocabulary[position]
+            if not token.startswith(prefix):
+                break
+            matches.update(self.postings[token])
+            position += 1
+        return matches
+
+    def search(self, query):
+        """
+        Return the labels of rows matching every token of query.
+        The last token is matched as a prefix so results update while typing.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        *complete, partial = tokens
+        candidate_sets = [self.postings.get(token, set()) for token in complete]
+        candidate_sets.append(self._prefix_matches(partial))
+        candidate_sets.sort(key=len)
+
+        result = set(candidate_sets[0])
+        for candidates in candidate_sets[1:]:
+            if not result:
+                break
+            result &= candidates
+        return sorted(result)
+
+    def filter(self, df, query):
+        """
+        Return the rows of df matching query, keeping df's row order.
+        A blank query matches every row; a query without any searchable
+        token (e.g. only punctuation) matches none.
+        """
+        if query is None or not str(query).strip():
+            return df
+        # Look matches up through df's index instead of scanning every row
+        positions = df.index.get_indexer(self.search(query))
+        return df.iloc[np.sort(positions[positions >= 0])]
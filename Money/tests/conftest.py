@@ -0,0 +1,25 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+MONEY_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, MONEY_DIR)
+
+DATA_FILES = [
+    'transactions_eur.csv',
+    'transactions_usd.csv',
+    'transactions_pen.csv',
+    'vendor_categories.csv',
+    'budgets.csv'
+]
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Copy the bundled CSV files to a temporary directory and run from there"""
+    for name in DATA_FILES:
+        shutil.copy(os.path.join(MONEY_DIR, name), tmp_path / name)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
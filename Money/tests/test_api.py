@@ -0,0 +1,92 @@
+import asyncio
+
+import pandas as pd
+
+from aiohttp.test_utils import TestClient, TestServer
+
+import api
+from expense_tracker import ExpenseTracker
+
+
+def run_with_client(check, monkeypatch):
+    """Start the API on a test server and run check(client, trackers)"""
+    trackers = []
+
+    class CountingTracker(ExpenseTracker):
+        def __init__(self, *args, **kwargs):
+            trackers.append(self)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(api, 'ExpenseTracker', CountingTracker)
+
+    async def main():
+        async with TestClient(TestServer(api.create_app())) as client:
+            await check(client, trackers)
+
+    asyncio.run(main())
+
+
+def test_cache_is_warm_and_tracker_loaded_once(data_dir, monkeypatch):
+    async def check(client, trackers):
+        ledger = client.server.app[api.LEDGER]
+        assert ('EUR', 'PEN', 'USD') in ledger.views
+
+        responses = await asyncio.gather(*[
+            client.get('/api/summary', params={'accounts': accounts})
+            for accounts in ['EUR', 'USD', 'PEN', 'EUR,USD', 'EUR', 'USD,PEN']
+        ])
+        assert [response.status for response in responses] == [200] * 6
+        assert len(trackers) == 1
+        assert len(ledger.views) == 6
+
+    run_with_client(check, monkeypatch)
+
+
+def test_reload_during_requests_drops_cached_ledgers(data_dir, monkeypatch):
+    async def check(client, trackers):
+        responses = await asyncio.gather(
+            client.get('/api/summary', params={'accounts': 'EUR'}),
+            client.post('/api/reload'),
+            client.get('/api/summary', params={'accounts': 'USD'}),
+        )
+        assert [response.status for response in responses] == [200] * 3
+        assert len(trackers) == 1
+
+        summary = await (await client.get('/api/summary')).json()
+        assert summary['transactions'] == 60
+
+    run_with_client(check, monkeypatch)
+
+
+def test_transactions_page_and_search(data_dir, monkeypatch):
+    async def check(client, trackers):
+        response = await client.get('/api/transactions', params={'q': 'groc', 'page_size': 2})
+        body = await response.json()
+        assert body['total'] == 4
+        assert len(body['transactions']) == 2
+
+        response = await client.get('/api/transactions', params={'accounts': 'GBP'})
+        assert response.status == 400
+
+    run_with_client(check, monkeypatch)
+
+
+def test_search_during_reload_uses_the_reloaded_ledger(data_dir, monkeypatch):
+    async def check(client, trackers):
+        eur = pd.read_csv('transactions_eur.csv')
+        extra = pd.DataFrame([(-3.20, 'Pret A Manger', '2025-01-01', 'Coffee')], columns=eur.columns)
+        pd.concat([extra, eur]).to_csv('transactions_eur.csv', index=False)
+
+        reloaded, response = await asyncio.gather(
+            client.post('/api/reload'),
+            client.get('/api/transactions', params={'accounts': 'EUR', 'q': 'netflix'}),
+        )
+        assert reloaded.status == 200
+        body = await response.json()
+        assert {row['vendor'] for row in body['transactions']} == {'Netflix'}
+
+        view = await client.server.app[api.LEDGER].get(['EUR'], search=True)
+        assert view['search_index'] is trackers[0].search_indexes[('EUR',)]
+        assert len(view['search_index']) == len(view['ledger']) == len(eur) + 1
+
+    run_with_client(check, monkeypatch)
@@ -0,0 +1,76 @@
+import pandas as pd
+import pytest
+
+from budgets import BudgetMonitor, normalize_rules
+
+AS_OF = '2025-03-10'
+
+
+def expenses(rows):
+    df = pd.DataFrame(rows, columns=['date', 'category', 'amount_usd'])
+    df['date'] = pd.to_datetime(df['date'])
+    return df
+
+
+def march_ledger():
+    return expenses([
+        ('2025-02-08', 'Groceries', -100.0),  # as_of - 30: outside every window
+        ('2025-02-09', 'Groceries', -7.0),    # as_of - 29: first day of the 30d window
+        ('2025-02-28', 'Groceries', -40.0),
+        ('2025-03-01', 'Shopping', -5.0),     # first day of the month
+        ('2025-03-03', 'Groceries', -20.0),   # as_of - 7: outside the 7d window
+        ('2025-03-04', 'Shopping', -10.0),    # as_of - 6: first day of the 7d window
+        ('2025-03-05', 'Groceries', 15.0),    # refunds are not spending
+    ])
+
+
+def test_window_boundaries_and_all_row():
+    spend = BudgetMonitor().add(march_ledger()).window_spend(AS_OF)
+
+    assert spend.loc['Groceries'].to_dict() == {'monthly': 20.0, '7d': 0.0, '30d': 67.0}
+    assert spend.loc['Shopping'].to_dict() == {'monthly': 15.0, '7d': 10.0, '30d': 15.0}
+    assert spend.loc['All'].to_dict() == {'monthly': 35.0, '7d': 10.0, '30d': 82.0}
+
+
+def test_rolling_spend_matches_trailing_window():
+    rolling = BudgetMonitor().add(march_ledger()).rolling_spend(days=7)
+    # Days without spending are filled in, and each value covers day - 6 .. day
+    assert rolling.loc['2025-03-02'].to_dict() == {'Groceries': 40.0, 'Shopping': 5.0}
+    assert rolling.loc['2025-03-04'].sum() == 75.0
+
+
+def test_evaluate_statuses():
+    rules = pd.DataFrame([
+        ('Groceries', '30d', 100, 0.6),   # 67% of the limit
+        ('Shopping', 'monthly', 15, 0.8),  # exactly at the limit
+        ('All', '7d', 50, 0.8),           # 20% of the limit
+        ('Shopping', '7d', 0, 0.8),       # zero limit with spending
+        ('Travel', 'monthly', 0, 0.8),    # zero limit, nothing spent
+    ], columns=['category', 'period', 'limit_usd', 'warn_at'])
+    results = BudgetMonitor(rules).add(march_ledger()).evaluate(AS_OF)
+
+    assert list(results['status']) == ['Warning', 'Over budget', 'OK', 'Over budget', 'OK']
+    assert results.loc[0, 'spent_usd'] == 67.0
+    assert results.loc[4, 'used'] == 0.0
+
+
+def test_combine_sums_account_monitors():
+    ledger = march_ledger()
+    first, second = ledger.iloc[:3], ledger.iloc[3:]
+    rules = pd.DataFrame({'category': ['All'], 'limit_usd': [100]})
+
+    combined = BudgetMonitor.combine([BudgetMonitor().add(first), BudgetMonitor().add(second)], rules)
+
+    pd.testing.assert_frame_equal(combined.window_spend(AS_OF),
+                                  BudgetMonitor().add(ledger).window_spend(AS_OF))
+    assert combined.evaluate(AS_OF).loc[0, 'spent_usd'] == 35.0
+
+
+def test_normalize_rules():
+    rules = normalize_rules(pd.DataFrame({'category': ['All'], 'period': [' 7D '], 'limit_usd': [-50]}))
+    assert rules.loc[0].to_dict() == {'category': 'All', 'period': '7d', 'limit_usd': 50.0, 'warn_at': 0.8}
+
+    with pytest.raises(ValueError, match='Unknown budget periods: weekly'):
+        normalize_rules(pd.DataFrame({'category': ['All'], 'period': ['weekly'], 'limit_usd': [50]}))
+    with pytest.raises(ValueError, match='limit_usd'):
+        normalize_rules(pd.DataFrame({'category': ['All']}))
@@ -0,0 +1,84 @@
+import pandas as pd
+
+import dedup
+from dedup import TransactionDeduplicator, flag_duplicates
+
+COLUMNS = ['amount', 'vendor', 'date', 'description']
+
+
+def account_rows(rows):
+    df = pd.DataFrame(rows, columns=COLUMNS)
+    df['account'] = 'EUR Account'
+    return df
+
+
+def write_ledger(path, df):
+    df[COLUMNS].to_csv(path, index=False)
+
+
+def two_coffees():
+    return account_rows([
+        (-3.20, 'Starbucks', '2025-03-01', 'Coffee'),
+        (-3.20, 'Starbucks', '2025-03-01', 'Coffee'),
+    ])
+
+
+def test_saved_index_is_rebuilt_after_an_edit(tmp_path):
+    path = str(tmp_path / 'dedup_index.npz')
+    ledger_file = str(tmp_path / 'transactions_eur.csv')
+    original = account_rows([
+        (-12.30, 'Netflix', '2025-01-20', 'Monthly subscription'),
+        (-45.50, 'Carrefour', '2025-01-15', 'Weekly groceries'),
+    ])
+    write_ledger(ledger_file, original)
+    TransactionDeduplicator.load_or_build(path, original, sources=[ledger_file])
+
+    # Same row count, corrected amount
+    edited = original.copy()
+    edited.loc[1, 'amount'] = -145.50
+    write_ledger(ledger_file, edited)
+    deduplicator = TransactionDeduplicator.load_or_build(path, edited, sources=[ledger_file])
+
+    new_rows, dropped = deduplicator.filter_new(edited.iloc[[1]])
+    assert new_rows.empty
+    assert dropped == 1
+
+
+def test_saved_index_is_loaded_without_hashing_after_imports(tmp_path, monkeypatch):
+    path = str(tmp_path / 'dedup_index.npz')
+    ledger_file = str(tmp_path / 'transactions_eur.csv')
+    ledger = account_rows([(-12.30, 'Netflix', '2025-01-20', 'Monthly subscription')])
+    write_ledger(ledger_file, ledger)
+    deduplicator = TransactionDeduplicator.load_or_build(path, ledger, sources=[ledger_file])
+
+    export = account_rows([(-12.30, 'Netflix', '2025-02-20', 'Monthly subscription')])
+    new_rows, _ = deduplicator.filter_new(export)
+    new_rows[COLUMNS].to_csv(ledger_file, mode='a', header=False, index=False)
+    deduplicator.save()
+
+    def rebuild(df):
+        raise AssertionError("ledger was hashed instead of loading the index")
+    monkeypatch.setattr(dedup, 'exact_hashes', rebuild)
+    monkeypatch.setattr(dedup, 'near_hashes', rebuild)
+
+    reloaded = TransactionDeduplicator.load_or_build(path, pd.concat([ledger, new_rows]), sources=[ledger_file])
+    assert len(reloaded.exact) == 2
+
+
+def test_repeats_inside_one_export_are_kept():
+    deduplicator = TransactionDeduplicator()
+
+    new_rows, dropped = deduplicator.filter_new(two_coffees())
+    assert (len(new_rows), dropped) == (2, 0)
+    assert new_rows.index.is_unique
+    assert new_rows['possible_duplicate'].all()
+
+    # Overlapping export with the same two coffees and a third one
+    new_rows, dropped = deduplicator.filter_new(pd.concat([two_coffees(), two_coffees().head(1)]))
+    assert (len(new_rows), dropped) == (1, 2)
+
+
+def test_flag_duplicates_keeps_every_row():
+    flagged = flag_duplicates(two_coffees())
+    assert len(flagged) == 2
+    assert flagged['possible_duplicate'].all()
@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+from engines import PandasEngine, PolarsEngine, compare_engines
+from expense_tracker import EXCHANGE_RATES, TRANSACTION_FILES, ExpenseTracker
+
+pytest.importorskip('polars')
+pytest.importorskip('pyarrow')
+
+
+def test_engines_match_on_bundled_csv_files(data_dir):
+    vendor_categories = pd.read_csv('vendor_categories.csv')
+    assert compare_engines(TRANSACTION_FILES, vendor_categories, EXCHANGE_RATES)
+
+
+def test_engines_match_on_loaded_frames_with_duplicates(data_dir):
+    vendor_categories = pd.read_csv('vendor_categories.csv')
+    eur = pd.read_csv('transactions_eur.csv')
+    overlap = pd.concat([eur, eur.head(5), pd.DataFrame([
+        (-12.30, 'NETFLIX ', '2025-01-20', 'other'),
+        (-8.00, 'Café  Ñandú', '2025-03-01', None),
+        (-8.00, 'cafe nandu', '2025-03-01', 'x'),
+        (-2.50, 'Straße Kiosk', '2025-03-02', None),
+        (-2.50, 'STRAßE  kiosk', '2025-03-02', None),
+    ], columns=eur.columns)], ignore_index=True)
+    sources = {'EUR': overlap, 'USD': pd.read_csv('transactions_usd.csv')}
+
+    assert compare_engines(sources, vendor_categories, EXCHANGE_RATES)
+    assert PandasEngine().combine(sources, vendor_categories, EXCHANGE_RATES)['possible_duplicate'].sum() == 15
+
+
+def test_tracker_scans_files_with_polars(data_dir):
+    pandas_tracker = ExpenseTracker(engine='pandas')
+    polars_tracker = ExpenseTracker(engine='polars')
+    assert polars_tracker.engine.name == 'polars'
+    pd.testing.assert_frame_equal(pandas_tracker.get_combined_data(), polars_tracker.get_combined_data())
+
+
+def test_engines_match_with_filters(data_dir):
+    vendor_categories = pd.read_csv('vendor_categories.csv')
+    for filters in [
+        {'start': '2025-02-01', 'end': '2025-03-31'},
+        {'categories': ['Groceries', 'Other']},
+        {'start': '2025-03-01', 'categories': ['Subscriptions']},
+        {'start': '2030-01-01'},
+    ]:
+        assert compare_engines(TRANSACTION_FILES, vendor_categories, EXCHANGE_RATES, **filters)
+
+    result = PandasEngine().combine(TRANSACTION_FILES, vendor_categories, EXCHANGE_RATES,
+                                    start='2025-02-01', end='2025-03-31', categories=['Groceries'])
+    assert result['date'].between('2025-02-01', '2025-03-31').all()
+    assert set(result['category']) == {'Groceries'}
+
+
+def test_polars_pushes_date_range_into_csv_scan(data_dir):
+    vendor_categories = pd.read_csv('vendor_categories.csv')
+    plan = PolarsEngine().plan({'EUR': 'transactions_eur.csv'}, vendor_categories, EXCHANGE_RATES,
+                               start='2025-03-01')
+    assert 'SELECTION: col("date") >= 2025-03-01' in plan.explain()
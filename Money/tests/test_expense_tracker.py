@@ -0,0 +1,57 @@
+import pandas as pd
+
+from expense_tracker import ExpenseTracker
+
+
+def write_export(path, rows):
+    pd.DataFrame(rows, columns=['amount', 'vendor', 'date', 'description']).to_csv(path, index=False)
+
+
+def test_import_same_export_twice(data_dir):
+    tracker = ExpenseTracker()
+    tracker.check_budgets()
+    before = len(pd.read_csv('transactions_eur.csv'))
+
+    write_export('export.csv', [
+        (-12.30, 'Netflix', '2025-07-20', 'Monthly subscription'),
+        (-40.00, 'Carrefour', '2025-07-22', 'Groceries'),
+    ])
+
+    assert tracker.import_transactions('export.csv', 'EUR') == 2
+    assert tracker.import_transactions('export.csv', 'EUR') == 0
+
+    assert len(pd.read_csv('transactions_eur.csv')) == before + 2
+    assert len(tracker.get_combined_data(['EUR'])) == before + 2
+
+
+def test_search_index_is_updated_incrementally_on_import(data_dir):
+    tracker = ExpenseTracker()
+    assert set(tracker.search('netflix')['vendor']) == {'Netflix', 'Netflix Peru'}
+    search_index = tracker.search_indexes[('EUR', 'PEN', 'USD')]
+    indexed = len(search_index)
+
+    write_export('export.csv', [(-7.99, 'Crunchyroll', '2025-07-01', 'Anime streaming')])
+    tracker.import_transactions('export.csv', 'USD')
+
+    assert tracker.search_indexes[('EUR', 'PEN', 'USD')] is search_index
+    assert len(search_index) == indexed + 1
+    assert list(tracker.search('crunchy')['vendor']) == ['Crunchyroll']
+    assert set(tracker.search('netflix')['vendor']) == {'Netflix', 'Netflix Peru'}
+
+
+def test_identical_purchases_in_one_export_are_both_imported(data_dir):
+    tracker = ExpenseTracker()
+    ledger = tracker.get_ledger(['EUR'])
+
+    coffee = (-3.20, 'Pret A Manger', '2025-07-01', 'Coffee')
+    write_export('export.csv', [coffee, coffee])
+    assert tracker.import_transactions('export.csv', 'EUR') == 2
+    assert tracker.import_transactions('export.csv', 'EUR') == 0
+
+    ledger = tracker.get_ledger(['EUR'])
+    assert ledger.index.is_unique
+    assert len(tracker.search('pret', ['EUR'])) == 2
+
+    # A fresh tracker loads the saved index and gives the rows the same ids
+    reloaded = ExpenseTracker()
+    assert set(reloaded.get_ledger(['EUR']).index) == set(ledger.index)
@@ -0,0 +1,44 @@
+import pandas as pd
+
+from recurring import find_recurring_payments
+
+
+def ledger(rows):
+    df = pd.DataFrame(rows, columns=['vendor', 'date', 'amount'])
+    df['date'] = pd.to_datetime(df['date'])
+    df['currency'] = 'EUR'
+    df['amount_usd'] = df['amount'] * 1.09
+    df['category'] = 'Subscriptions'
+    return df
+
+
+def monthly_netflix():
+    return [('Netflix', f'2025-{month:02d}-20', -12.30) for month in range(1, 7)]
+
+
+def test_detects_monthly_subscription():
+    recurring = find_recurring_payments(ledger(monthly_netflix()))
+    assert list(recurring['vendor']) == ['Netflix']
+    assert recurring.loc[0, 'frequency'] == 'Monthly'
+    assert recurring.loc[0, 'occurrences'] == 6
+
+
+def test_refund_does_not_hide_subscription():
+    rows = monthly_netflix() + [('Netflix', '2025-03-21', 12.30)]
+    recurring = find_recurring_payments(ledger(rows))
+    assert list(recurring['vendor']) == ['Netflix']
+    assert recurring.loc[0, 'amount'] == -12.30
+
+
+def test_occurrences_count_charge_dates():
+    rows = monthly_netflix() + [('Netflix', '2025-02-20', -12.30)]
+    recurring = find_recurring_payments(ledger(rows))
+    assert recurring.loc[0, 'occurrences'] == 6
+
+
+def test_separates_subscriptions_from_one_vendor():
+    rows = [('Apple', f'2025-{month:02d}-05', amount)
+            for month in range(1, 7) for amount in (-0.99, -9.99)]
+    recurring = find_recurring_payments(ledger(rows))
+    assert sorted(recurring['amount']) == [-9.99, -0.99]
+    assert list(recurring['frequency']) == ['Monthly', 'Monthly']
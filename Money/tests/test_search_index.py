@@ -0,0 +1,27 @@
+import pandas as pd
+
+from search_index import SearchIndex, tokenize
+
+
+def indexed(vendors):
+    df = pd.DataFrame({'vendor': vendors, 'description': ''})
+    search_index = SearchIndex(['vendor', 'description'])
+    search_index.add(df)
+    return search_index, df
+
+
+def test_non_latin_text_is_searchable():
+    assert tokenize('Яндекс Такси') == ['яндекс', 'такси']
+    search_index, df = indexed(['Яндекс Такси', 'Carrefour'])
+    assert list(search_index.filter(df, 'такси')['vendor']) == ['Яндекс Такси']
+
+
+def test_query_without_tokens_matches_nothing():
+    search_index, df = indexed(['Netflix', 'Carrefour'])
+    assert search_index.filter(df, '!!').empty
+    assert search_index.filter(df, '  ') is df
+
+
+def test_search_casefolds():
+    search_index, df = indexed(['Straße 12 Parking', 'Carrefour'])
+    assert list(search_index.filter(df, 'strasse')['vendor']) == ['Straße 12 Parking']